@@ -1,8 +1,25 @@
 from six.moves.urllib.parse import urlparse, urlencode
-from six.moves.urllib.request import Request, urlopen
-from six.moves.urllib.error import HTTPError, URLError
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from operator import attrgetter
+import io
+import json
 import re
 import logging
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from lxml import etree as ET
+    _LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _LXML = False
 
 from owmeta_core.graph_object import IdentifierMissingException
 from owmeta_core.context import Context
@@ -13,6 +30,31 @@ from . import bibtex as BIB
 
 logger = logging.getLogger(__name__)
 
+# How long, in seconds, responses from each service are kept in the response cache.
+# DOIs are immutable, so Crossref records are kept the longest
+_WORMBASE_CACHE_TTL = 24 * 60 * 60
+_PUBMED_CACHE_TTL = 7 * 24 * 60 * 60
+_CROSSREF_CACHE_TTL = 4 * 7 * 24 * 60 * 60
+
+_HTTP_PREFIX = ('http://', 'https://')
+
+_CHARSET_RE = re.compile(r"charset\s*=\s*([^\s;]+)", re.I)
+
+# Names of ``DocSum`` items in PubMed summaries and the `Document` properties they
+# correspond to. Authors are handled separately since they're nested in "AuthorList"
+_PUBMED_ITEMS = {'Title': 'title', 'DOI': 'doi', 'PubDate': 'year'}
+
+# Matches the DOIs Crossref has issued. See
+# https://www.crossref.org/blog/dois-and-matching-regular-expressions/
+_DOI_RE = re.compile(r"(10\.\d{4,9}/[-._;()/:A-Z0-9]+)", re.I)
+
+# bioRxiv and medRxiv landing pages append a version and sometimes ".full" and the like
+# to the DOI, neither of which are part of the DOI itself
+_BIORXIV_DOI_RE = re.compile(r"(10\.1101/\d[\d.]*\d)")
+
+# Publishers append these to the DOI in the URLs of their landing pages
+_DOI_URL_SUFFIXES = ('/abstract', '/full', '/pdf')
+
 
 class WormbaseRetrievalException(Exception):
     pass
@@ -54,6 +96,10 @@ class Document(BaseDocument):
         doi: a Digitial Object id or url (e.g., s00454-010-9273-0)
         uri: a URI specific to the document, preferably usable for accessing
              the document
+
+    If the ``document.response_cache`` configuration value is set, responses from
+    WormBase, PubMed, and Crossref are cached in an SQLite database at that path and
+    reused by later lookups until they expire.
     """
 
     class_context = SCI_CTX
@@ -85,6 +131,15 @@ class Document(BaseDocument):
     title = DatatypeProperty()
     ''' The title of the document '''
 
+    id_precedence = ('doi', 'pmid', 'wbid', 'uri')
+    ''' Names of the properties an identifier can be made from, in order of preference '''
+
+    _id_getters = tuple((name, attrgetter(name)) for name in id_precedence)
+
+    _augmented_id = None
+
+    _resolved_id_getter = None
+
     def __init__(
             self,
             bibtex=None,
@@ -106,13 +161,11 @@ class Document(BaseDocument):
         """
         super(Document, self).__init__(**kwargs)
 
-        self.id_precedence = ('doi', 'pmid', 'wbid', 'uri')
-
         if bibtex is not None:
             self.update_with_bibtex(bibtex)
 
         if pubmed is not None and not self.pmid.has_defined_value():
-            if pubmed[:4] == 'http':
+            if pubmed.startswith(_HTTP_PREFIX):
                 _tmp = _pubmed_uri_to_pmid(pubmed)
                 if _tmp is None:
                     raise ValueError("Couldn't convert Pubmed URL to a PubMed ID")
@@ -122,7 +175,7 @@ class Document(BaseDocument):
             self.pmid.set(pmid)
 
         if wormbase is not None and not self.wbid.has_defined_value():
-            if wormbase[:4] == 'http':
+            if wormbase.startswith(_HTTP_PREFIX):
                 _tmp = _wormbase_uri_to_wbid(wormbase)
                 if _tmp is None:
                     raise ValueError("Couldn't convert Wormbase URL to a Wormbase ID")
@@ -132,70 +185,110 @@ class Document(BaseDocument):
             self.wbid.set(wbid)
 
         if doi is not None:
-            if doi[:4] == 'http':
+            if doi.startswith(_HTTP_PREFIX):
                 _tmp = _doi_uri_to_doi(doi)
                 if _tmp is not None:
                     doi = _tmp
             self.doi.set(doi)
 
     def update_with_bibtex(self, bibtex):
-        bib_db = BIB.loads(bibtex)
+        bib_db = _load_bibtex(bibtex)
         if len(bib_db.entries) > 1:
             raise ValueError('The given BibTex string has %d entries.'
                              ' Cannot determine which entry to use for the document' % len(bib_db))
         BIB.update_document_with_bibtex(self, bib_db.entries[0])
 
     def defined_augment(self):
-        for x in self.id_precedence:
-            if getattr(self, x).has_defined_value():
+        # The property we last resolved an identifier from is almost always still
+        # defined, so we check it before going through the others
+        if (self._resolved_id_getter is not None and
+                self._resolved_id_getter(self).has_defined_value()):
+            return True
+        for _, getter in self._id_getters:
+            if getter(self).has_defined_value():
+                self._resolved_id_getter = getter
                 return True
         return False
 
     def identifier_augment(self):
-        for idKind in self.id_precedence:
-            idprop = getattr(self, idKind)
+        for idKind, getter in self._id_getters:
+            idprop = getter(self)
             if idprop.has_defined_value():
+                self._resolved_id_getter = getter
                 s = str(idKind) + ":" + idprop.defined_values[0].identifier.n3()
-                return self.make_identifier(s)
+                # The identifier is requested many times over while serializing, so we
+                # keep the last one rather than re-hash the same key each time
+                if self._augmented_id is None or self._augmented_id[0] != s:
+                    self._augmented_id = (s, self.make_identifier(s))
+                return self._augmented_id[1]
         raise IdentifierMissingException(self)
 
+    def _response_cache(self):
+        return _open_response_cache(self.conf.get('document.response_cache', None))
+
     # TODO: Provide a way to override modification of already set values.
     def update_from_wormbase(self, replace_existing=False):
         """ Queries wormbase for additional data to fill in the Document.
 
         If replace_existing is set to `True`, then existing values will be cleared.
         """
+        wbid = self._wormbase_id()
+        try:
+            self._update_from_wormbase_response(
+                    self._wormbase_request(wbid, self._response_cache()),
+                    replace_existing)
+        except Exception:
+            logger.warning("Couldn't retrieve Wormbase data", exc_info=True)
 
-        # XXX: wormbase's REST API is pretty sparse in terms of data provided.
-        #     Would be better off using AQL or the perl interface
-        # _Very_ few of these have these fields filled in
-        wbid = self.wbid.defined_values
-        if len(wbid) == 1:
-            wbid = wbid[0].identifier.toPython()
+    def fetch_all_metadata(self, replace_existing=False):
+        """ Queries WormBase, PubMed, and Crossref for additional data to fill in the Document.
+
+        Each service is queried only if the Document has the corresponding identifier.
+        The requests are made concurrently and, once all of them have completed, the
+        responses are applied in the order WormBase, PubMed, Crossref.
+
+        Parameters
+        ----------
+        replace_existing : bool, optional
+            If `True`, existing values will be cleared by data from WormBase. See
+            `update_from_wormbase`
+        """
+        # The cache is opened here rather than on the worker threads
+        try:
+            cache = self._response_cache()
+        except Exception:
+            logger.warning("Couldn't open the response cache", exc_info=True)
+            return
+        lookups = []
+        if self.wbid.has_defined_value():
+            lookups.append((partial(self._wormbase_request, self._wormbase_id(), cache),
+                            partial(self._update_from_wormbase_response,
+                                    replace_existing=replace_existing)))
+        if self.pmid.has_defined_value():
+            lookups.append((partial(_pubmed_request, (self._pubmed_id(),),
+                                    self.get('pubmed.api_key', None),
+                                    cache),
+                            self._update_from_pubmed_summaries))
+        if self.doi.has_defined_value():
+            lookups.append((partial(self._crossref_request, self._crossref_doi(), cache),
+                            self._update_from_crossref_response))
+
+        if not lookups:
+            return
 
-            # get the author
+        with ThreadPoolExecutor(max_workers=len(lookups)) as executor:
+            futures = [(executor.submit(request), apply) for request, apply in lookups]
+
+        for future, apply in futures:
             try:
-                root = self.conf.get('wormbase_api_root_url', 'http://rest.wormbase.org')
-                url = root + '/rest/widget/paper/' + str(wbid) + '/overview?content-type=application%2Fjson'
-                j = _json_request(url)
-                if 'fields' in j:
-                    f = j['fields']
-                    if 'authors' in f:
-                        dat = f['authors']['data']
-                        if dat is not None:
-                            if replace_existing and self.author.has_defined_value:
-                                self.author.clear()
-                            for x in dat:
-                                self.author.set(x['label'])
-
-                    for fname in ('pmid', 'year', 'title', 'doi'):
-                        if fname in f and f[fname]['data'] is not None:
-                            attr = getattr(self, fname)
-                            if replace_existing and attr.has_defined_value:
-                                attr.clear()
-                            attr.set(f[fname]['data'])
+                apply(future.result())
             except Exception:
-                logger.warning("Couldn't retrieve Wormbase data", exc_info=True)
+                logger.warning("Couldn't retrieve metadata for %s", self, exc_info=True)
+
+    def _wormbase_id(self):
+        wbid = self.wbid.defined_values
+        if len(wbid) == 1:
+            return wbid[0].identifier.toPython()
         elif len(wbid) == 0:
             raise WormbaseRetrievalException("There is no Wormbase ID attached to this Document."
                                              " So no data can be retrieved")
@@ -203,23 +296,64 @@ class Document(BaseDocument):
             raise WormbaseRetrievalException("There is more than one Wormbase ID attached to this Document."
                                              " Please try with just one Wormbase ID")
 
+    def _wormbase_request(self, wbid, cache=None):
+        root = self.conf.get('wormbase_api_root_url', 'http://rest.wormbase.org')
+        url = root + '/rest/widget/paper/' + str(wbid) + '/overview?content-type=application%2Fjson'
+        return _json_request(url, cache=cache, expire_after=_WORMBASE_CACHE_TTL)
+
+    def _update_from_wormbase_response(self, j, replace_existing=False):
+        # XXX: wormbase's REST API is pretty sparse in terms of data provided.
+        #     Would be better off using AQL or the perl interface
+        # _Very_ few of these have these fields filled in
+        if 'fields' in j:
+            f = j['fields']
+            if 'authors' in f:
+                dat = f['authors']['data']
+                if dat is not None:
+                    if replace_existing and self.author.has_defined_value:
+                        self.author.clear()
+                    for x in dat:
+                        self.author.set(x['label'])
+
+            for fname in ('pmid', 'year', 'title', 'doi'):
+                if fname in f and f[fname]['data'] is not None:
+                    attr = getattr(self, fname)
+                    if replace_existing and attr.has_defined_value:
+                        attr.clear()
+                    attr.set(f[fname]['data'])
+
     def _crossref_doi_extract(self):
         # Extract data from crossref
-        def crRequest(doi):
-            data = {'q': doi}
-            data_encoded = urlencode(data)
-            return _json_request(
-                'http://search.labs.crossref.org/dois?%s' %
-                data_encoded)
-
-        doi = self.doi()
-        if doi[:4] == 'http':
-            doi = _doi_uri_to_doi(doi)
+        doi = self._crossref_doi()
+        if doi is None:
+            logger.warning("No DOI is attached to this document. Cannot retrieve Crossref info")
+            return
         try:
-            r = crRequest(doi)
+            r = self._crossref_request(doi, self._response_cache())
         except Exception:
             logger.warning("Couldn't retrieve Crossref info", exc_info=True)
             return
+        self._update_from_crossref_response(r)
+
+    def _crossref_doi(self):
+        doi = self.doi.defined_values
+        if not doi:
+            return None
+        doi = doi[0].identifier.toPython()
+        if doi.startswith(_HTTP_PREFIX):
+            doi = _doi_uri_to_doi(doi) or doi
+        return doi
+
+    def _crossref_request(self, doi, cache=None):
+        data = {'q': doi}
+        data_encoded = urlencode(data)
+        return _json_request(
+            'http://search.labs.crossref.org/dois?%s' %
+            data_encoded,
+            cache=cache,
+            expire_after=_CROSSREF_CACHE_TTL)
+
+    def _update_from_crossref_response(self, r):
         # XXX: I don't think coins is meant to be used, but it has structured
         # data...
         if len(r) > 0:
@@ -240,48 +374,137 @@ class Document(BaseDocument):
                     self.year(r['year'])
 
     def update_from_pubmed(self):
-        def pmRequest(pmid):
-            import xml.etree.ElementTree as ET  # Python 2.5 and up
-            url = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=pubmed&id=' + str(pmid)
-            key = self.get('pubmed.api_key', None)
-            if key:
-                url += '&api_key=' + key
-            else:
-                logger.warning("PubMed API key not defined. API calls will be limited.")
-            s = _url_request(url)
-            if hasattr(s, 'charset'):
-                parser = ET.XMLParser(encoding=s.charset)
-            else:
-                parser = None
+        """ Queries PubMed for additional data to fill in the Document.
 
-            return ET.parse(s, parser)
+        See Also
+        --------
+        bulk_update_from_pubmed : for updating many documents at once
+        """
+        pmid = self._pubmed_id()
+        try:
+            summaries = _pubmed_request((pmid,),
+                                   self.get('pubmed.api_key', None),
+                                   self._response_cache())
+        except Exception:
+            logger.warning("Couldn't retrieve Pubmed info", exc_info=True)
+            return
+        self._update_from_pubmed_summaries(summaries)
 
-        pmid = self.pmid.defined_values
-        if len(pmid) == 1:
-            pmid = pmid[0].identifier.toPython()
-            try:
-                tree = pmRequest(pmid)
-            except Exception:
-                logger.warning("Couldn't retrieve Pubmed info", exc_info=True)
-                return
-            for x in tree.findall('./DocSum/Item[@Name="AuthorList"]/Item'):
-                self.author(x.text)
+    @classmethod
+    def bulk_update_from_pubmed(cls, documents, batch_size=200):
+        """ Queries PubMed for additional data to fill in several Documents.
 
-            for x in tree.findall('./DocSum/Item[@Name="Title"]'):
-                self.title(x.text)
+        Rather than making one request per document as `update_from_pubmed` does, the
+        summaries for up to `batch_size` PubMed IDs are retrieved with each request.
 
-            for x in tree.findall('./DocSum/Item[@Name="DOI"]'):
-                self.doi(x.text)
+        Parameters
+        ----------
+        documents : iterable of Document
+            The documents to update. Each must have exactly one PubMed ID
+        batch_size : int, optional
+            The maximum number of PubMed IDs to look up per request
+        """
+        by_pmid = dict()
+        for doc in documents:
+            by_pmid.setdefault(doc._pubmed_id(), []).append(doc)
+
+        if not by_pmid:
+            return
 
-            for x in tree.findall('./DocSum/Item[@Name="PubDate"]'):
-                self.year(x.text)
+        first = next(iter(by_pmid.values()))[0]
+        key = first.get('pubmed.api_key', None)
+        try:
+            cache = first._response_cache()
+        except Exception:
+            logger.warning("Couldn't open the response cache", exc_info=True)
+            return
+        pmids = list(by_pmid)
+        for i in range(0, len(pmids), batch_size):
+            try:
+                summaries = _pubmed_request(pmids[i:i + batch_size], key, cache)
+            except Exception:
+                logger.warning("Couldn't retrieve Pubmed info", exc_info=True)
+                continue
+            for pmid, fields in summaries:
+                for doc in by_pmid.get(pmid, ()):
+                    doc._update_from_pubmed_summary(fields)
 
+    def _pubmed_id(self):
+        pmid = self.pmid.defined_values
+        if len(pmid) == 1:
+            return str(pmid[0].identifier.toPython())
         elif len(pmid) == 0:
             raise PubmedRetrievalException('No Pubmed ID is attached to this document. Cannot retrieve Pubmed data')
         else:
             raise PubmedRetrievalException('More than one Pubmed ID is attached to this document.'
                                            ' Please try with just one Pubmed ID')
 
+    def _update_from_pubmed_summaries(self, summaries):
+        for _, fields in summaries:
+            self._update_from_pubmed_summary(fields)
+
+    def _update_from_pubmed_summary(self, fields):
+        for prop, values in fields.items():
+            for value in values:
+                getattr(self, prop)(value)
+
+
+def _pubmed_request(pmids, api_key=None, cache=None):
+    url = ('https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=pubmed&id=' +
+           ','.join(str(pmid) for pmid in pmids))
+    # The response doesn't depend on the API key, so it's left out of the cache key.
+    # That also keeps the key from being written to the cache
+    cache_key = url
+    if api_key:
+        url += '&api_key=' + api_key
+    else:
+        logger.warning("PubMed API key not defined. API calls will be limited.")
+    s = _url_request(url, cache=cache, expire_after=_PUBMED_CACHE_TTL,
+                     cache_key=cache_key)
+    return list(_pubmed_summaries(s))
+
+
+def _pubmed_summaries(s):
+    '''
+    Extract the fields we use from each ``DocSum`` in an esummary response
+
+    The response is parsed in a single pass and each ``DocSum`` is discarded once its
+    fields have been extracted.
+
+    Yields
+    ------
+    tuple
+        The PubMed ID and a `dict` from `Document` property names to lists of values
+    '''
+    charset = getattr(s, 'charset', None)
+    if charset is None:
+        events = ET.iterparse(s)
+    elif _LXML:
+        events = ET.iterparse(s, encoding=charset)
+    else:
+        events = ET.iterparse(s, parser=ET.XMLParser(encoding=charset))
+
+    for _, elem in events:
+        if elem.tag != 'DocSum':
+            continue
+        fields = {prop: [] for prop in ('author',) + tuple(_PUBMED_ITEMS.values())}
+        for item in elem.iterfind('Item'):
+            name = item.get('Name')
+            if name == 'AuthorList':
+                fields['author'].extend(x.text for x in item)
+            elif name in _PUBMED_ITEMS:
+                fields[_PUBMED_ITEMS[name]].append(item.text)
+        yield elem.findtext('Id'), fields
+        elem.clear()
+
+
+@lru_cache(maxsize=1024)
+def _load_bibtex(bibtex):
+    # The same entry is often given for many Documents (e.g., when records from a
+    # shared .bib file are loaded), so we keep the parsed results. They're only read
+    # from, so sharing them is safe
+    return BIB.loads(bibtex)
+
 
 def _wormbase_uri_to_wbid(uri):
     return str(urlparse(uri).path.split("/")[2])
@@ -294,8 +517,23 @@ def _pubmed_uri_to_pmid(uri):
 def _doi_uri_to_doi(uri):
     # DOI URL to DOI translation is complicated. This is a cop-out.
     parsed = urlparse(uri)
-    if 'doi.org' in parsed.netloc:
+    netloc = parsed.netloc.lower()
+    if netloc == 'doi.org' or netloc.endswith('.doi.org'):
         doi = parsed.path.split("/", 1)[1]
+    elif (netloc in ('biorxiv.org', 'medrxiv.org') or
+            netloc.endswith(('.biorxiv.org', '.medrxiv.org'))):
+        md = _BIORXIV_DOI_RE.search(parsed.path)
+        doi = md.group(1) if md else None
+    elif netloc:
+        # Publisher landing pages often have the DOI in the path (e.g.,
+        # https://onlinelibrary.wiley.com/doi/10.1002/cne.20345/abstract)
+        md = _DOI_RE.search(parsed.path)
+        doi = md.group(1) if md else None
+        if doi is not None:
+            for suffix in _DOI_URL_SUFFIXES:
+                if doi.endswith(suffix):
+                    doi = doi[:-len(suffix)]
+                    break
     else:
         doi = None
 
@@ -307,30 +545,136 @@ class EmptyRes(object):
         return bytes()
 
 
-def _url_request(url, headers={}):
+class _BufferedResponse(io.BytesIO):
+    '''
+    A response whose body has already been read
+    '''
+    def __init__(self, body, content_type):
+        super(_BufferedResponse, self).__init__(body)
+        charset = _content_type_charset(content_type)
+        if charset:
+            self.charset = charset
+
+
+class _ResponseCache(object):
+    '''
+    A persistent cache of HTTP response bodies keyed on the request URL
+
+    The time each response was fetched and its content type are stored along with the
+    body so that stale entries can be expired and the charset recovered.
+    '''
+
+    def __init__(self, path):
+        # Lookups may be made from several threads (see `Document.fetch_all_metadata`),
+        # so access to the connection is serialized with a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS response'
+                               ' (url TEXT PRIMARY KEY, fetched REAL, content_type TEXT,'
+                               ' body BLOB)')
+
+    def get(self, url, expire_after=None):
+        '''
+        Get the cached response for the URL
+
+        Parameters
+        ----------
+        url : str
+            The requested URL
+        expire_after : float, optional
+            Number of seconds after which a response is considered stale. If not
+            provided, responses do not expire
+
+        Returns
+        -------
+        _BufferedResponse or None
+            The response or `None` if there's no fresh response for the URL
+        '''
+        with self._lock:
+            row = self._conn.execute('SELECT fetched, content_type, body FROM response'
+                                     ' WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        fetched, content_type, body = row
+        if expire_after is not None and time.time() - fetched > expire_after:
+            return None
+        return _BufferedResponse(body, content_type)
+
+    def put(self, url, content_type, body):
+        '''
+        Store a response for the URL, replacing any response already stored
+        '''
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO response VALUES (?, ?, ?, ?)',
+                               (url, time.time(), content_type, body))
+        return _BufferedResponse(body, content_type)
+
+
+_response_caches = dict()
+_response_caches_lock = threading.Lock()
+
+
+def _open_response_cache(path):
+    if path is None:
+        return None
+    with _response_caches_lock:
+        res = _response_caches.get(path)
+        if res is None:
+            res = _ResponseCache(path)
+            _response_caches[path] = res
+    return res
+
+
+def _content_type_charset(content_type):
+    md = _CHARSET_RE.search(content_type)
+    if md:
+        return md.group(1)
+
+
+def _make_session():
+    # Requests for a Document go to the same few hosts, so we keep connections open
+    # between requests rather than paying for a new connection (and TLS handshake)
+    # each time
+    session = requests.Session()
+    # Only retry for rate limiting and server errors. A host that can't be reached or
+    # doesn't answer in time won't do better on a retry, so we fail right away
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                          max_retries=Retry(total=3, connect=0, read=0,
+                                            backoff_factor=0.3,
+                                            status_forcelist=(429, 500, 502, 503, 504)))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_SESSION = _make_session()
+
+
+def _url_request(url, headers={}, cache=None, expire_after=None, cache_key=None):
+    if cache_key is None:
+        cache_key = url
+    if cache is not None:
+        s = cache.get(cache_key, expire_after)
+        if s is not None:
+            return s
     try:
-        r = Request(url, headers=headers)
-        s = urlopen(r, timeout=1)
-        info = dict(s.info())
-        content_type = {k.lower(): info[k] for k in info}['content-type']
-        md = re.search("charset *= *([^ ]+)", content_type)
-        if md:
-            s.charset = md.group(1)
-
-        return s
-    except HTTPError:
-        logger.error("Error in request for {}".format(url), exc_info=True)
-        return EmptyRes()
-    except URLError:
+        r = _SESSION.get(url, headers=headers, timeout=1)
+        r.raise_for_status()
+    except requests.RequestException:
         logger.error("Error in request for {}".format(url), exc_info=True)
         return EmptyRes()
 
+    content_type = r.headers.get('Content-Type', '')
+    if cache is not None:
+        return cache.put(cache_key, content_type, r.content)
+    return _BufferedResponse(r.content, content_type)
+
 
-def _json_request(url):
-    import json
+def _json_request(url, cache=None, expire_after=None):
     headers = {'Accept': 'application/json'}
     try:
-        data = _url_request(url, headers).read().decode('UTF-8')
+        data = _url_request(url, headers, cache, expire_after).read().decode('UTF-8')
         if hasattr(data, 'charset'):
             return json.loads(data, encoding=data.charset)
         else:
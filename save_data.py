@@ -1,5 +1,4 @@
 import argparse
-import types
 
 from owmeta_core.command import OWM
 from owmeta.data_trans.wormatlas import (WormAtlasCellListDataTranslator,
@@ -18,32 +17,9 @@ from owmeta.data_trans.context_merge import ContextMergeDataTranslator
 from owmeta.data_trans.data_with_evidence_ds import DataWithEvidenceDataSource as DWEDS
 
 
-# metaclass stuff to keep track of the order of data sources in DSMethods.
-# Copied from PEP 3115
-class member_table(dict):
-    def __init__(self):
-        self.member_names = []
-
-    def __setitem__(self, key, value):
-        if key not in self:
-            self.member_names.append(key)
-
-        dict.__setitem__(self, key, value)
-
-
-class OrderedClass(type):
-    @classmethod
-    def __prepare__(metacls, name, bases): # No keywords in this case
-        return member_table()
-
-    def __new__(cls, name, bases, classdict):
-        result = type.__new__(cls, name, bases, dict(classdict))
-        result.member_names = classdict.member_names
-        return result
-
-
-class DSMethods(metaclass=OrderedClass):
-    # Note: Keep the ordering of
+class DSMethods:
+    # Note: Methods are run in the order they're defined. Keep the ordering of
+    # translators with dependencies on other translators' outputs.
     def __init__(self):
         self.owm = OWM()
         self.ctx = self.owm.default_context.stored
@@ -146,10 +122,12 @@ class DSMethods(metaclass=OrderedClass):
                 output_identifier='http://openworm.org/data')
 
     def methods(self):
-        return list(x for x in self.member_names
+        # Class namespaces preserve definition order, so this gives the methods in
+        # the order they're defined
+        return [x for x, v in vars(type(self)).items()
                 if x not in ('save', 'methods') and
                 not x.startswith('_') and
-                isinstance(getattr(self, x), types.MethodType))
+                callable(v)]
 
     def save(self):
         self.ctx.save()
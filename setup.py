@@ -47,6 +47,7 @@ setup(
         'bibtexparser~=1.1.0',
         'libneuroml',
         'rdflib>=4.1.2',
+        'requests',
         'six~=1.10'
     ],
     version=version,
@@ -28,26 +28,26 @@ class DataIntegrityTest(unittest.TestCase):
     def setUpClass(cls):
         # grab the list of the names of the 302 neurons
 
-        csvfile = open('tests/neurons.csv', 'r')
-        reader = csv.reader(csvfile, delimiter=';', quotechar='|')
-
-        # array that holds the names of the 302 neurons at class-level scope
-        cls.neurons = []
-        for row in reader:
-            if len(row[0]) > 0:  # Only saves valid neuron names
-                cls.neurons.append(row[0])
-
-    def setUp(self):
-        self.bnd = Bundle('openworm/owmeta-data')
-        self.bnd.initdb()
-        self.conn = self.bnd.connection
-        self.conf = self.conn.conf
-        self.g = self.conf["rdf.graph"]
-        self.context = self.conn(Context)(ident="http://openworm.org/data")
-        self.qctx = self.context.stored
-
-    def tearDown(self):
-        self.conn.disconnect()
+        with open('tests/neurons.csv', 'r') as csvfile:
+            reader = csv.reader(csvfile, delimiter=';', quotechar='|')
+
+            # tuple that holds the names of the 302 neurons at class-level scope.
+            # Only saves valid neuron names
+            cls.neurons = tuple(row[0] for row in reader if row and row[0])
+        cls.neuron_set = frozenset(cls.neurons)
+
+        # The tests only read from the bundle, so they can all share one connection
+        cls.bnd = Bundle('openworm/owmeta-data')
+        cls.bnd.initdb()
+        cls.conn = cls.bnd.connection
+        cls.conf = cls.conn.conf
+        cls.g = cls.conf["rdf.graph"]
+        cls.context = cls.conn(Context)(ident="http://openworm.org/data")
+        cls.qctx = cls.context.stored
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.disconnect()
 
     def test_correct_neuron_number(self):
         """
@@ -97,23 +97,31 @@ class DataIntegrityTest(unittest.TestCase):
         missing neurons.
         """
 
-        results = {}
-        for n in self.neurons:
-            # Create a SPARQL query per neuron that looks for all RDF nodes
-            # that have text matching the name of the neuron
-            qres = self.g.query(
-                f"""
-                SELECT distinct ?n WHERE
-                {{
-                    ?n <{Cell.name.link}> {R.Literal(n).n3()}
-                }} LIMIT 5
-                """)
-            results[n] = (len(qres), [x[0] for x in qres])
+        # Look for all RDF nodes that have text matching the name of any of the
+        # neurons in a single query
+        names = ' '.join(R.Literal(n).n3() for n in self.neurons)
+        qres = self.g.query(
+            f"""
+            SELECT distinct ?name ?n WHERE
+            {{
+                VALUES ?name {{ {names} }}
+                ?n <{Cell.name.link}> ?name
+            }}
+            """)
+        nodes = {n: [] for n in self.neurons}
+        for name, node in qres:
+            nodes[str(name)].append(node)
+        results = {n: (len(x), x) for n, x in nodes.items()}
 
         # If there is not only one result back, then there is more than one RDF
         # node.
-        more_than_one = [(x, results[x]) for x in results if results[x][0] > 1]
-        less_than_one = [(x, results[x]) for x in results if results[x][0] < 1]
+        more_than_one = []
+        less_than_one = []
+        for x, res in results.items():
+            if res[0] > 1:
+                more_than_one.append((x, res))
+            elif res[0] < 1:
+                less_than_one.append((x, res))
         self.assertEqual(
             0,
             len(more_than_one),
@@ -131,22 +139,19 @@ class DataIntegrityTest(unittest.TestCase):
         """
         Every Neuron should have a non-blank type
         """
-        results = set()
-        for n in self.neurons:
-            s = f'''SELECT ?v WHERE {{
-                       ?k <{Cell.name.link}> {R.Literal(n).n3()} .
-                       ?k <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <{Neuron.rdf_type}> .
-                       ?k <{Neuron.type.link}> ?v .
-                    }}'''
-            qres = self.g.query(s)
-            for x in qres:
-                v = x[0]
-                if isinstance(v, R.Literal):
-                    results.add(n)
+        # Get the names of all typed neurons at once rather than querying for each
+        # neuron
+        qres = self.g.query(f'''SELECT DISTINCT ?n WHERE {{
+                   ?k <{Cell.name.link}> ?n .
+                   ?k <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <{Neuron.rdf_type}> .
+                   ?k <{Neuron.type.link}> ?v .
+                   FILTER(isLiteral(?v))
+                }}''')
+        results = {str(x[0]) for x in qres} & self.neuron_set
 
         self.assertEqual(len(results),
                          len(self.neurons),
-                         "Some neurons are missing a type: {}".format(set(self.neurons) - results))
+                         "Some neurons are missing a type: {}".format(self.neuron_set - results))
 
     def test_neuron_GJ_degree(self):
         """ Get the number of gap junctions from a representation """
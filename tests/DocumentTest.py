@@ -1,9 +1,25 @@
 # -*- coding: utf-8 -*-
+import io
 import unittest
+from unittest.mock import patch
+import shutil
+import sqlite3
+import tempfile
+import threading
+from os.path import join as p
+
+import requests
 from .DataTestTemplate import _DataTest
 from owmeta_core.graph_object import IdentifierMissingException
+from owmeta import bibtex as BIB
 from owmeta.document import (Document,
                              _doi_uri_to_doi,
+                             _url_request,
+                             _pubmed_request,
+                             _pubmed_summaries,
+                             _load_bibtex,
+                             _ResponseCache,
+                             _SESSION,
                              WormbaseRetrievalException)
 import pytest
 
@@ -28,6 +44,20 @@ class DocumentTest(_DataTest):
         """
         self.assertIn(u'Jean César', self.ctx.Document(bibtex=bibtex).author())
 
+    def test_bibtex_init_parsed_once(self):
+        bibtex = u"""@ARTICLE{Doe2013,
+          author = {Jane Doe},
+          title = {An amazing title},
+          year = {2013},
+        }
+        """
+        _load_bibtex.cache_clear()
+        with patch('owmeta.bibtex.loads', wraps=BIB.loads) as loads:
+            doc1 = self.ctx.Document(bibtex=bibtex)
+            doc2 = self.ctx.Document(bibtex=bibtex)
+        loads.assert_called_once()
+        self.assertEqual(doc1.author(), doc2.author())
+
     def test_doi_param_sets_id(self):
         doc = Document(doi='blah')
         self.assertIsNotNone(doc.identifier)
@@ -37,16 +67,61 @@ class DocumentTest(_DataTest):
         doc2 = Document(doi='blah')
         self.assertEquals(doc2.identifier, doc1.identifier)
 
+    def test_doi_https_uri_param_sets_id(self):
+        doc1 = Document(doi='https://doi.org/blah')
+        doc2 = Document(doi='blah')
+        self.assertEqual(doc2.identifier, doc1.identifier)
+
     def test_non_doi_uri_to_doi(self):
         doc = Document(doi='http://example.org/blah')
         self.assertIsNotNone(doc.identifier)
 
+    def test_identifier_follows_id_change(self):
+        doc = Document(pmid='1234')
+        pmid_ident = doc.identifier
+        doc.doi('blah')
+        self.assertNotEqual(pmid_ident, doc.identifier)
+        self.assertEqual(Document(doi='blah').identifier, doc.identifier)
+
+    def test_defined_after_id_cleared(self):
+        doc = Document(doi='blah', pubmed='1234')
+        self.assertTrue(doc.defined)
+        doc.doi.clear()
+        self.assertTrue(doc.defined)
+        doc.pmid.clear()
+        self.assertFalse(doc.defined)
+
+    def test_identifier_stable(self):
+        doc = Document(doi='blah')
+        self.assertEqual(doc.identifier, doc.identifier)
+
 
 class DOIURITest(unittest.TestCase):
     def test_match(self):
         doi = _doi_uri_to_doi('http://doi.org/blah')
         self.assertEqual('blah', doi)
 
+    def test_match_dx(self):
+        doi = _doi_uri_to_doi('https://dx.doi.org/10.1098/rstb.1952.0012')
+        self.assertEqual('10.1098/rstb.1952.0012', doi)
+
+    def test_biorxiv(self):
+        doi = _doi_uri_to_doi('https://www.biorxiv.org/content/10.1101/2020.03.12.989475v2.full')
+        self.assertEqual('10.1101/2020.03.12.989475', doi)
+
+    def test_biorxiv_old_style(self):
+        doi = _doi_uri_to_doi('https://www.biorxiv.org/content/10.1101/124578v1')
+        self.assertEqual('10.1101/124578', doi)
+
+    def test_medrxiv_bare_host(self):
+        doi = _doi_uri_to_doi('https://medrxiv.org/content/10.1101/2020.03.12.20034512v1')
+        self.assertEqual('10.1101/2020.03.12.20034512', doi)
+
+    def test_biorxiv_lookalike_host(self):
+        # Only the generic publisher-path lookup finds a non-bioRxiv DOI
+        doi = _doi_uri_to_doi('https://notbiorxiv.org/doi/10.1002/cne.20345')
+        self.assertEqual('10.1002/cne.20345', doi)
+
     def test_nomatch(self):
         doi = _doi_uri_to_doi('http://example.org/blah')
         self.assertIsNone(doi)
@@ -59,6 +134,263 @@ class DOIURITest(unittest.TestCase):
         doi = _doi_uri_to_doi('blahblah')
         self.assertIsNone(doi)
 
+    def test_publisher_uri(self):
+        doi = _doi_uri_to_doi('https://onlinelibrary.wiley.com/doi/10.1002/cne.20345/abstract')
+        self.assertEqual('10.1002/cne.20345', doi)
+
+    def test_publisher_uri_no_doi(self):
+        doi = _doi_uri_to_doi('https://onlinelibrary.wiley.com/journal/10969861')
+        self.assertIsNone(doi)
+
+
+ESUMMARY_RESPONSE = b'''<?xml version="1.0" encoding="UTF-8" ?>
+<eSummaryResult>
+<DocSum>
+    <Id>1</Id>
+    <Item Name="AuthorList" Type="List">
+        <Item Name="Author" Type="String">Doe J</Item>
+    </Item>
+    <Item Name="Title" Type="String">First</Item>
+    <Item Name="PubDate" Type="Date">2013 Oct</Item>
+    <Item Name="ArticleIds" Type="List">
+        <Item Name="doi" Type="String">10.1000/first</Item>
+    </Item>
+    <Item Name="DOI" Type="String">10.1000/first</Item>
+</DocSum>
+<DocSum>
+    <Id>2</Id>
+    <Item Name="AuthorList" Type="List">
+        <Item Name="Author" Type="String">Roe R</Item>
+    </Item>
+    <Item Name="Title" Type="String">Second</Item>
+</DocSum>
+</eSummaryResult>
+'''
+
+
+class PubmedSummariesTest(unittest.TestCase):
+    def test_ids(self):
+        summaries = _pubmed_summaries(io.BytesIO(ESUMMARY_RESPONSE))
+        self.assertEqual(['1', '2'], [pmid for pmid, _ in summaries])
+
+    def test_fields(self):
+        _, fields = next(_pubmed_summaries(io.BytesIO(ESUMMARY_RESPONSE)))
+        self.assertEqual({'author': ['Doe J'],
+                          'title': ['First'],
+                          'doi': ['10.1000/first'],
+                          'year': ['2013 Oct']}, fields)
+
+
+class BulkPubmedTest(_DataTest):
+    ctx_classes = (Document,)
+
+    def test_single_request(self):
+        doc1 = self.ctx.Document(pmid='1')
+        doc2 = self.ctx.Document(pmid='2')
+        with patch('owmeta.document._url_request') as url_request:
+            url_request.return_value = io.BytesIO(ESUMMARY_RESPONSE)
+            Document.bulk_update_from_pubmed([doc1, doc2])
+        url_request.assert_called_once()
+        self.assertIn('id=1,2', url_request.call_args[0][0])
+
+    def test_dispatch_by_id(self):
+        doc1 = self.ctx.Document(pmid='1')
+        doc2 = self.ctx.Document(pmid='2')
+        with patch('owmeta.document._url_request') as url_request:
+            url_request.return_value = io.BytesIO(ESUMMARY_RESPONSE)
+            Document.bulk_update_from_pubmed([doc2, doc1])
+        self.assertEqual('First', doc1.title.defined_values[0].identifier.toPython())
+        self.assertEqual('Second', doc2.title.defined_values[0].identifier.toPython())
+
+    def test_batch_size(self):
+        docs = [self.ctx.Document(pmid=str(i)) for i in range(5)]
+        with patch('owmeta.document._url_request') as url_request:
+            url_request.side_effect = lambda *args, **kwargs: io.BytesIO(ESUMMARY_RESPONSE)
+            Document.bulk_update_from_pubmed(docs, batch_size=2)
+        self.assertEqual(3, url_request.call_count)
+
+    def test_response_cache_error(self):
+        doc = self.ctx.Document(pmid='1')
+        with patch('owmeta.document._open_response_cache',
+                   side_effect=sqlite3.OperationalError), \
+                patch('owmeta.document._url_request') as url_request:
+            Document.bulk_update_from_pubmed([doc])
+        url_request.assert_not_called()
+
+
+class FetchAllMetadataTest(_DataTest):
+    ctx_classes = (Document,)
+
+    def test_no_ids(self):
+        doc = self.ctx.Document()
+        with patch('owmeta.document._url_request') as url_request:
+            doc.fetch_all_metadata()
+        url_request.assert_not_called()
+
+    def test_wormbase_and_pubmed(self):
+        doc = self.ctx.Document(wormbase='WBPaper1', pmid='1')
+        wormbase_response = {'fields': {'authors': {'data': [{'label': 'Doe JA'}]}}}
+        with patch('owmeta.document._json_request') as json_request, \
+                patch('owmeta.document._url_request') as url_request:
+            json_request.return_value = wormbase_response
+            url_request.return_value = io.BytesIO(ESUMMARY_RESPONSE)
+            doc.fetch_all_metadata()
+        authors = [x.identifier.toPython() for x in doc.author.defined_values]
+        self.assertIn('Doe JA', authors)
+        self.assertIn('Doe J', authors)
+
+    def test_failed_lookup_does_not_stop_others(self):
+        doc = self.ctx.Document(wormbase='WBPaper1', pmid='1')
+        with patch('owmeta.document._json_request') as json_request, \
+                patch('owmeta.document._url_request') as url_request:
+            json_request.side_effect = Exception
+            url_request.return_value = io.BytesIO(ESUMMARY_RESPONSE)
+            doc.fetch_all_metadata()
+        self.assertIn('Doe J', [x.identifier.toPython() for x in doc.author.defined_values])
+
+    def test_response_cache_opened_on_calling_thread(self):
+        doc = self.ctx.Document(wormbase='WBPaper1', pmid='1', doi='10.1000/first')
+        threads = []
+
+        def open_response_cache(path):
+            threads.append(threading.current_thread())
+
+        with patch('owmeta.document._open_response_cache', side_effect=open_response_cache), \
+                patch('owmeta.document._json_request') as json_request, \
+                patch('owmeta.document._url_request') as url_request:
+            json_request.return_value = {}
+            url_request.return_value = io.BytesIO(ESUMMARY_RESPONSE)
+            doc.fetch_all_metadata()
+        self.assertEqual([threading.current_thread()], threads)
+
+    def test_response_cache_error(self):
+        doc = self.ctx.Document(wormbase='WBPaper1', pmid='1')
+        with patch('owmeta.document._open_response_cache',
+                   side_effect=sqlite3.OperationalError), \
+                patch('owmeta.document._url_request') as url_request:
+            doc.fetch_all_metadata()
+        url_request.assert_not_called()
+
+
+class CrossrefTest(_DataTest):
+    ctx_classes = (Document,)
+
+    def test_no_doi(self):
+        doc = self.ctx.Document()
+        with patch('owmeta.document._json_request') as json_request:
+            doc._crossref_doi_extract()
+        json_request.assert_not_called()
+
+    def test_doi_uri_query(self):
+        doc = self.ctx.Document(doi='https://doi.org/10.1000/first')
+        with patch('owmeta.document._json_request') as json_request:
+            json_request.return_value = []
+            doc._crossref_doi_extract()
+        self.assertIn('q=10.1000%2Ffirst', json_request.call_args[0][0])
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.testdir = tempfile.mkdtemp(prefix=__name__ + '.')
+        self.cut = _ResponseCache(p(self.testdir, 'responses.sqlite'))
+
+    def tearDown(self):
+        shutil.rmtree(self.testdir)
+
+    def test_miss(self):
+        self.assertIsNone(self.cut.get('http://example.org/doc'))
+
+    def test_hit(self):
+        self.cut.put('http://example.org/doc', 'text/xml', b'<doc/>')
+        self.assertEqual(b'<doc/>', self.cut.get('http://example.org/doc').read())
+
+    def test_hit_charset(self):
+        self.cut.put('http://example.org/doc', 'text/xml; charset=latin-1', b'<doc/>')
+        self.assertEqual('latin-1', self.cut.get('http://example.org/doc').charset)
+
+    def test_hit_charset_with_parameters(self):
+        self.cut.put('http://example.org/doc', 'text/xml; Charset=latin-1; q=1', b'<doc/>')
+        self.assertEqual('latin-1', self.cut.get('http://example.org/doc').charset)
+
+    def test_expired(self):
+        self.cut.put('http://example.org/doc', 'text/xml', b'<doc/>')
+        self.assertIsNone(self.cut.get('http://example.org/doc', expire_after=-1))
+
+    def test_persists(self):
+        self.cut.put('http://example.org/doc', 'text/xml', b'<doc/>')
+        cache = _ResponseCache(p(self.testdir, 'responses.sqlite'))
+        self.assertEqual(b'<doc/>', cache.get('http://example.org/doc').read())
+
+    def test_url_request_cache_hit_skips_request(self):
+        self.cut.put('http://example.org/doc', 'text/xml', b'<doc/>')
+        with patch('owmeta.document._SESSION') as session:
+            res = _url_request('http://example.org/doc', cache=self.cut)
+        session.get.assert_not_called()
+        self.assertEqual(b'<doc/>', res.read())
+
+    def test_url_request_cache_miss_stores(self):
+        with patch('owmeta.document._SESSION') as session:
+            session.get.return_value.headers = {'Content-Type': 'text/xml'}
+            session.get.return_value.content = b'<doc/>'
+            _url_request('http://example.org/doc', cache=self.cut)
+        self.assertEqual(b'<doc/>', self.cut.get('http://example.org/doc').read())
+
+    def test_pubmed_request_api_key_not_cached(self):
+        with patch('owmeta.document._SESSION') as session:
+            session.get.return_value.headers = {'Content-Type': 'text/xml'}
+            session.get.return_value.content = ESUMMARY_RESPONSE
+            _pubmed_request(('1',), 'secret-key', self.cut)
+        self.assertIn('api_key=secret-key', session.get.call_args[0][0])
+        urls = [row[0] for row in self.cut._conn.execute('SELECT url FROM response')]
+        self.assertEqual(1, len(urls))
+        self.assertNotIn('api_key', urls[0])
+
+    def test_pubmed_request_cached_regardless_of_api_key(self):
+        with patch('owmeta.document._SESSION') as session:
+            session.get.return_value.headers = {'Content-Type': 'text/xml'}
+            session.get.return_value.content = ESUMMARY_RESPONSE
+            _pubmed_request(('1',), 'secret-key', self.cut)
+            _pubmed_request(('1',), None, self.cut)
+        self.assertEqual(1, session.get.call_count)
+
+
+class URLRequestTest(unittest.TestCase):
+    def test_charset(self):
+        with patch('owmeta.document._SESSION') as session:
+            session.get.return_value.headers = {'Content-Type': 'text/xml; charset=latin-1'}
+            session.get.return_value.content = b'<doc/>'
+            res = _url_request('http://example.org/doc')
+        self.assertEqual('latin-1', res.charset)
+
+    def test_no_content_type(self):
+        with patch('owmeta.document._SESSION') as session:
+            session.get.return_value.headers = requests.structures.CaseInsensitiveDict()
+            session.get.return_value.content = b'<doc/>'
+            res = _url_request('http://example.org/doc')
+        self.assertEqual(b'<doc/>', res.read())
+
+    def test_error(self):
+        with patch('owmeta.document._SESSION') as session:
+            session.get.side_effect = requests.ConnectionError
+            res = _url_request('http://example.org/doc')
+        self.assertEqual(b'', res.read())
+
+    def test_timeout(self):
+        with patch('owmeta.document._SESSION') as session:
+            session.get.return_value.headers = {'Content-Type': 'text/xml'}
+            session.get.return_value.content = b'<doc/>'
+            _url_request('http://example.org/doc')
+        self.assertEqual(1, session.get.call_args[1]['timeout'])
+
+    def test_no_retry_on_connection_errors(self):
+        retry = _SESSION.get_adapter('https://example.org/doc').max_retries
+        self.assertEqual(0, retry.connect)
+        self.assertEqual(0, retry.read)
+
+    def test_retry_on_server_errors(self):
+        retry = _SESSION.get_adapter('https://example.org/doc').max_retries
+        self.assertTrue(retry.is_retry('GET', 503))
+
 
 @pytest.mark.inttest
 class DocumentElaborationTest(_DataTest):
@@ -0,0 +1,33 @@
+import unittest
+
+from owmeta.utils import normalize_cell_name
+
+
+class NormalizeCellNameTest(unittest.TestCase):
+
+    def test_zero_padded_number(self):
+        self.assertEqual('VD1', normalize_cell_name('VD01'))
+
+    def test_zero_padded_muscle_number(self):
+        self.assertEqual('MDL8', normalize_cell_name('MDL08'))
+
+    def test_zero_padded_number_with_suffix(self):
+        self.assertEqual('VD1L', normalize_cell_name('VD01L'))
+
+    def test_trailing_zero_kept(self):
+        self.assertEqual('DB10', normalize_cell_name('DB10'))
+
+    def test_zero_padded_number_with_trailing_space(self):
+        self.assertEqual('VD1 ', normalize_cell_name('VD01 '))
+
+    def test_second_zero_run_removed(self):
+        self.assertEqual('VA1', normalize_cell_name('VA010'))
+
+    def test_no_number(self):
+        self.assertEqual('AVAL', normalize_cell_name('AVAL'))
+
+    def test_lower_case(self):
+        self.assertEqual('AS1', normalize_cell_name('as01'))
+
+    def test_body_wall_muscle(self):
+        self.assertEqual('MDL8', normalize_cell_name('MDBWML08'))